@@ -1,6 +1,7 @@
 import logging
+import os
 import pandas as pd
-import numpy as np
+from typing import List
 from fastapi import FastAPI, HTTPException, Depends
 from sqlalchemy.orm import Session
 from . import database
@@ -13,6 +14,10 @@ database.init_db()
 logger = logging.getLogger("boston.api")
 app = FastAPI(title="Boston Housing Price Prediction API")
 pipeline = load_pipeline()
+if not hasattr(pipeline, "predict_interval"):
+    logger.warning("Loaded model has no prediction intervals. Bounds will be null.")
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "500"))
 
 
 def get_db():
@@ -28,42 +33,112 @@ def health_check():
     return {"status": "ok", "message": "API is running!"}
 
 
+def predict_records(input_df: pd.DataFrame) -> List[dict]:
+    """Predicción e intervalo de cada registro en una sola llamada vectorizada.
+
+    Los modelos entrenados antes de los intervalos solo exponen ``predict``;
+    en ese caso las cotas se devuelven como None.
+    """
+    if hasattr(pipeline, "predict_interval"):
+        predictions, lower, upper = pipeline.predict_interval(input_df)
+    else:
+        predictions = pipeline.predict(input_df)
+        lower = upper = [None] * len(input_df)
+
+    # Condición de negocio: sin RM ni LSTAT la predicción es 0
+    no_signal = (input_df["RM"].isna() & input_df["LSTAT"].isna()).to_numpy()
+    if no_signal.any():
+        logger.info(f"RM and LSTAT are NaN for {no_signal.sum()} records. Prediction is 0.")
+
+    results = []
+    for skip, prediction_value, lower_bound, upper_bound in zip(
+        no_signal, predictions, lower, upper
+    ):
+        if skip:
+            prediction_value = lower_bound = upper_bound = 0.0
+        results.append(
+            {
+                "prediction": float(prediction_value),
+                "lower_bound": None if lower_bound is None else float(lower_bound),
+                "upper_bound": None if upper_bound is None else float(upper_bound),
+            }
+        )
+    return results
+
+
 @app.post("/predict", tags=["Predictions"])
 def predict(payload: HousingFeatures, db: Session = Depends(get_db)):
     """Realiza una predicción y la guarda en la base de datos."""
     logger.info(f"Received prediction request: {payload.model_dump()}")
     payload_dict = payload.model_dump()
 
-    # TODO: La lógica de la condición de negocio
-    if np.isnan(payload_dict.get('RM')) and np.isnan(payload_dict.get('LSTAT')):
-        prediction_value = 0.0
-        logger.info("RM and LSTAT are NaN. Prediction is 0.")
-    else:
-        try:
-            input_df = pd.DataFrame([payload_dict])
-            input_df = input_df[FEATURES]
-            prediction_value = pipeline.predict(input_df)[0]
+    try:
+        input_df = pd.DataFrame([payload_dict])
+        input_df = input_df[FEATURES]
+        result = predict_records(input_df)[0]
 
-        except Exception as e:
-            logger.error(f"Prediction error: {e}", exc_info=True)
-            db.rollback()
-            raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+    except Exception as e:
+        logger.error(f"Prediction error: {e}", exc_info=True)
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
     # Continuamos con el resto de la lógica (guardado en la base de datos)
     try:
         prediction_inputs = {key.lower(): value for key, value in payload_dict.items()}
         db_prediction = database.Prediction(
-            prediction_value=prediction_value,
+            prediction_value=result["prediction"],
             **prediction_inputs
         )
         db.add(db_prediction)
         db.commit()
         db.refresh(db_prediction)
 
-        logger.info(f"Prediction result: {prediction_value}. Saved with id: {db_prediction.id}")
-        return {"prediction": prediction_value}
+        logger.info(f"Prediction result: {result['prediction']}. Saved with id: {db_prediction.id}")
+        return result
+
+    except Exception as e:
+        logger.error(f"Database save error: {e}", exc_info=True)
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database save error: {str(e)}")
+
+
+@app.post("/predict/batch", tags=["Predictions"])
+def predict_batch(payloads: List[HousingFeatures], db: Session = Depends(get_db)):
+    """Realiza predicciones con intervalo para un lote en una sola llamada vectorizada."""
+    logger.info(f"Received batch prediction request with {len(payloads)} records")
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size {len(payloads)} exceeds the maximum of {MAX_BATCH_SIZE}",
+        )
+    payload_dicts = [payload.model_dump() for payload in payloads]
+    if not payload_dicts:
+        return {"predictions": []}
+
+    try:
+        input_df = pd.DataFrame(payload_dicts)[FEATURES]
+        results = predict_records(input_df)
+
+    except Exception as e:
+        logger.error(f"Prediction error: {e}", exc_info=True)
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
+    try:
+        for payload_dict, result in zip(payload_dicts, results):
+            prediction_inputs = {key.lower(): value for key, value in payload_dict.items()}
+            db.add(
+                database.Prediction(
+                    prediction_value=result["prediction"],
+                    **prediction_inputs
+                )
+            )
+        db.commit()
+
+        logger.info(f"Batch prediction saved: {len(payload_dicts)} records")
+        return {"predictions": results}
 
     except Exception as e:
         logger.error(f"Database save error: {e}", exc_info=True)
         db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database save error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database save error: {str(e)}")
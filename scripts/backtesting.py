@@ -42,13 +42,16 @@ def run_backtest():
                 response = requests.post(API_URL, json=payload)
                 response.raise_for_status()
 
-                prediction = response.json().get("prediction")
+                response_json = response.json()
+                prediction = response_json.get("prediction")
                 actual_value = row['MEDV']
 
                 results.append({
                     "id": index,
                     "actual_value": actual_value,
                     "predicted_value": prediction,
+                    "lower_bound": response_json.get("lower_bound"),
+                    "upper_bound": response_json.get("upper_bound"),
                     "payload_sent": payload
                 })
 
@@ -82,10 +85,24 @@ def run_backtest():
                 mae = mean_absolute_error(valid_results['actual_value'], valid_results['predicted_value'])
                 mse = mean_squared_error(valid_results['actual_value'], valid_results['predicted_value'])
 
+                # Los modelos anteriores a los intervalos devuelven cotas nulas
+                if {'lower_bound', 'upper_bound'}.issubset(valid_results.columns):
+                    interval_results = valid_results.dropna(subset=['lower_bound', 'upper_bound'])
+                else:
+                    interval_results = valid_results.iloc[0:0]
+
+                interval_coverage = None
+                if not interval_results.empty:
+                    interval_coverage = (
+                        (interval_results['actual_value'] >= interval_results['lower_bound'])
+                        & (interval_results['actual_value'] <= interval_results['upper_bound'])
+                    ).mean()
+
                 # Crear un DataFrame para las métricas
                 metrics_df = pd.DataFrame([{
                     "mae": mae,
                     "mse": mse,
+                    "interval_coverage": interval_coverage,
                     "num_predictions": len(valid_results)
                 }])
 
@@ -98,6 +115,10 @@ def run_backtest():
                 logging.info("--- Resumen de Métricas del Backtesting ---")
                 logging.info(f"MAE (Mean Absolute Error): {mae:.2f}")
                 logging.info(f"MSE (Mean Squared Error): {mse:.2f}")
+                if interval_coverage is None:
+                    logging.warning("La API no devolvió intervalos de predicción; cobertura no disponible.")
+                else:
+                    logging.info(f"Cobertura del intervalo de predicción: {interval_coverage:.2%}")
                 logging.info("----------------------------------------")
             else:
                 logging.warning("No hay predicciones válidas para calcular métricas.")
@@ -15,6 +15,7 @@ MODEL_PATH = MODEL_DIR / "best_pipeline.pkl"
 SHAP_SUMMARY_PATH = REPORTS_DIR / "shap_summary.png"
 METRICS_PATH = REPORTS_DIR / "metrics.json"
 AUTOML_SUMMARY_REPORT_PATH = REPORTS_DIR / "automl_summary.txt"
+AUTOML_LOG_PATH = BASE_DIR / "automl_flaml.log"
 MAIN_LOG_PATH = REPORTS_DIR / "main.log"
 FEATURE_IMPORTANCE_PLOT_PATH = REPORTS_DIR / "feature_importance.png"
 
@@ -28,3 +29,12 @@ TEST_SIZE = params["test_size"]
 RANDOM_STATE = params["random_state"]
 AUTOML_TIME_BUDGET = params["automl_budget_secs"]
 FEATURES = params["features"]
+
+INFERENCE_CONSTRAINTS = params.get("inference_constraints") or {}
+MAX_PREDICT_LATENCY_P99_MS = INFERENCE_CONSTRAINTS.get("max_predict_latency_p99_ms")
+MAX_MODEL_SIZE_MB = INFERENCE_CONSTRAINTS.get("max_model_size_mb")
+LATENCY_SAMPLE_ROWS = INFERENCE_CONSTRAINTS.get("latency_sample_rows", 20)
+
+PREDICTION_INTERVAL = params.get("prediction_interval") or {}
+INTERVAL_ALPHA = PREDICTION_INTERVAL.get("alpha", 0.1)
+INTERVAL_MAX_LATENCY_OVERHEAD = PREDICTION_INTERVAL.get("max_latency_overhead", 0.25)
@@ -0,0 +1,135 @@
+import pickle
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from flaml.automl.training_log import training_log_reader
+from sklearn.metrics import r2_score
+
+from src.config import LATENCY_SAMPLE_ROWS
+
+
+def measure_inference_cost(
+    *, model: object, X, latency_sample_rows: int = LATENCY_SAMPLE_ROWS
+) -> Dict:
+    """Mide latencia por fila, throughput en lote y tamaño serializado de un modelo."""
+    n_rows = min(latency_sample_rows, len(X))
+    latencies_ms = []
+    for i in range(n_rows):
+        start = time.perf_counter()
+        model.predict(X[i : i + 1])
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict(X)
+    batch_secs = time.perf_counter() - start
+
+    model_size_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+    return {
+        "predict_latency_p50_ms": float(np.percentile(latencies_ms, 50)),
+        "predict_latency_p99_ms": float(np.percentile(latencies_ms, 99)),
+        "batch_throughput_rows_per_sec": float(len(X) / max(batch_secs, 1e-9)),
+        "model_size_mb": model_size_bytes / 1024**2,
+    }
+
+
+# Costo medido por trial: FLAML evalúa la métrica una vez por fold de CV.
+_TRIAL_COST_CACHE: Dict = {}
+
+
+def reset_trial_cost_cache() -> None:
+    """Vacía el costo cacheado de los trials de una búsqueda anterior."""
+    _TRIAL_COST_CACHE.clear()
+
+
+def cost_aware_r2(
+    X_val, y_val, estimator, labels, X_train, y_train, *args, **kwargs
+):
+    """Métrica personalizada de FLAML: pérdida 1 - R2 y costo de inferencia del candidato.
+
+    El costo se mide una sola vez por trial (estimador, hiperparámetros y tamaño de
+    muestra) y se reutiliza en los demás folds de CV.
+    """
+    y_pred = estimator.predict(X_val)
+    val_loss = 1 - r2_score(y_val, y_pred)
+
+    params = getattr(estimator, "params", None)
+    if params is None:
+        params = estimator.get_params()
+    # Cada fold reparte la misma muestra entre entrenamiento y validación
+    sample_size = len(X_train) + len(X_val)
+    cache_key = (type(estimator).__name__, repr(sorted(params.items())), sample_size)
+    if cache_key not in _TRIAL_COST_CACHE:
+        _TRIAL_COST_CACHE[cache_key] = measure_inference_cost(
+            model=estimator, X=X_val
+        )
+
+    metrics_to_log = {"r2_score": 1 - val_loss}
+    metrics_to_log.update(_TRIAL_COST_CACHE[cache_key])
+    return val_loss, metrics_to_log
+
+
+def read_trials(*, log_file) -> List[Dict]:
+    """Lee del log de FLAML el estimador, la configuración, la pérdida y el costo de cada trial.
+
+    Requiere ``log_type="all"``; con el valor por defecto FLAML solo registra los
+    trials que mejoran la mejor pérdida global.
+    """
+    trials = []
+    with training_log_reader(str(log_file)) as reader:
+        for record in reader.records():
+            if not record.logged_metric:
+                continue
+            config = record.config.get("ml", record.config)
+            config = {
+                key: value
+                for key, value in config.items()
+                if key not in ("FLAML_sample_size", "learner", "_choice_")
+            }
+            trials.append(
+                {
+                    "learner": record.learner,
+                    "config": config,
+                    "val_loss": record.validation_loss,
+                    **record.logged_metric,
+                }
+            )
+    return trials
+
+
+def is_feasible(*, trial: Dict, metric_constraints: list) -> bool:
+    """Indica si un trial cumple todas las restricciones ``(métrica, op, umbral)``."""
+    for metric_name, op, threshold in metric_constraints:
+        value = trial.get(metric_name)
+        if value is None:
+            return False
+        if op == "<=" and value > threshold:
+            return False
+        if op == ">=" and value < threshold:
+            return False
+    return True
+
+
+def select_best_feasible_trial(
+    *, trials: List[Dict], metric_constraints: list
+) -> Optional[Dict]:
+    """Devuelve el trial de menor pérdida que cumple las restricciones, o None."""
+    feasible = [
+        trial
+        for trial in trials
+        if is_feasible(trial=trial, metric_constraints=metric_constraints)
+    ]
+    return min(feasible, key=lambda trial: trial["val_loss"], default=None)
+
+
+def summarize_candidate_costs(*, trials: List[Dict]) -> Dict:
+    """Resume el costo de inferencia del mejor trial de cada estimador."""
+    candidates = {}
+    for trial in trials:
+        learner = trial["learner"]
+        if learner not in candidates or trial["val_loss"] < candidates[learner]["val_loss"]:
+            candidates[learner] = {
+                key: value for key, value in trial.items() if key not in ("learner", "config")
+            }
+    return candidates
@@ -0,0 +1,72 @@
+import math
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from src.config import INTERVAL_ALPHA
+
+
+def conformal_quantile(*, residuals, alpha: float = INTERVAL_ALPHA) -> float:
+    """Cuantil conformal (split conformal) de los residuos absolutos.
+
+    Si ``ceil((n + 1)(1 - alpha)) > n`` el intervalo conformal es infinito; en ese
+    caso se lanza ``ValueError`` en lugar de recortar al residuo máximo y perder
+    la garantía de cobertura.
+    """
+    residuals = np.sort(np.abs(np.asarray(residuals, dtype=float)))
+    n = len(residuals)
+    k = math.ceil((n + 1) * (1 - alpha))
+    if k > n:
+        raise ValueError(
+            f"{n} calibration residuals are too few for alpha={alpha}: "
+            f"at least {math.ceil(1 / alpha) - 1} are required"
+        )
+    return float(residuals[k - 1])
+
+
+class ConformalIntervalRegressor:
+    """Envuelve el pipeline entrenado y añade intervalos de predicción conformales.
+
+    ``predict`` conserva la interfaz del pipeline; ``predict_interval`` devuelve
+    la predicción puntual y sus cotas a partir de una única llamada vectorizada.
+    """
+
+    def __init__(self, *, pipeline: object, residual_quantile: float, alpha: float):
+        self.pipeline = pipeline
+        self.residual_quantile = residual_quantile
+        self.alpha = alpha
+
+    def predict(self, X) -> np.ndarray:
+        return self.pipeline.predict(X)
+
+    def predict_interval(self, X) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        prediction = self.pipeline.predict(X)
+        return (
+            prediction,
+            prediction - self.residual_quantile,
+            prediction + self.residual_quantile,
+        )
+
+
+def benchmark_interval_overhead(
+    *, model: ConformalIntervalRegressor, X, repeats: int = 30
+) -> Dict:
+    """Compara la latencia mediana de ``predict`` y ``predict_interval`` sobre un lote."""
+    point_secs, interval_secs = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(X)
+        point_secs.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        model.predict_interval(X)
+        interval_secs.append(time.perf_counter() - start)
+
+    point_ms = float(np.median(point_secs)) * 1000
+    interval_ms = float(np.median(interval_secs)) * 1000
+    return {
+        "point_latency_ms": point_ms,
+        "interval_latency_ms": interval_ms,
+        "latency_overhead": interval_ms / point_ms - 1,
+    }
@@ -1,21 +1,58 @@
+import logging
+from typing import Dict, List
+
 from flaml import AutoML
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
-from src.config import RANDOM_STATE, AUTOML_TIME_BUDGET
+from src.config import (
+    AUTOML_LOG_PATH,
+    AUTOML_TIME_BUDGET,
+    MAX_MODEL_SIZE_MB,
+    MAX_PREDICT_LATENCY_P99_MS,
+    RANDOM_STATE,
+)
+from src.inference_cost import (
+    cost_aware_r2,
+    read_trials,
+    reset_trial_cost_cache,
+    select_best_feasible_trial,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_metric_constraints() -> list:
+    """Traduce las restricciones de inferencia de params.yaml al formato de FLAML."""
+    metric_constraints = []
+    if MAX_PREDICT_LATENCY_P99_MS is not None:
+        metric_constraints.append(
+            ("predict_latency_p99_ms", "<=", MAX_PREDICT_LATENCY_P99_MS)
+        )
+    if MAX_MODEL_SIZE_MB is not None:
+        metric_constraints.append(("model_size_mb", "<=", MAX_MODEL_SIZE_MB))
+    return metric_constraints
 
-def create_pipeline() -> Pipeline:
-    """Ensambla y devuelve el pipeline completo de Scikit-learn."""
+
+def create_pipeline(**automl_overrides) -> Pipeline:
+    """Ensambla y devuelve el pipeline completo de Scikit-learn.
+
+    ``automl_overrides`` reemplaza ajustes de FLAML (p. ej. ``max_iter`` en tests).
+    """
 
     automl_settings = {
         "time_budget": AUTOML_TIME_BUDGET,
-        "metric": "r2",
+        "metric": cost_aware_r2,
+        "metric_constraints": build_metric_constraints(),
         "task": "regression",
-        "log_file_name": "automl_flaml.log",
+        "log_file_name": str(AUTOML_LOG_PATH),
+        # Registrar todos los trials, no solo los que mejoran la mejor pérdida global
+        "log_type": "all",
         "seed": RANDOM_STATE,
         "n_splits": 5,
     }
+    automl_settings.update(automl_overrides)
 
     price_prediction_pipeline = Pipeline(
         [
@@ -26,3 +63,56 @@ def create_pipeline() -> Pipeline:
     )
 
     return price_prediction_pipeline
+
+
+def fit_within_constraints(*, pipeline: Pipeline, X, y) -> Dict:
+    """Entrena el pipeline y garantiza que el modelo final cumple las restricciones de inferencia.
+
+    Devuelve los trials del log de FLAML, el trial seleccionado y si hubo reentreno.
+    """
+    reset_trial_cost_cache()
+    pipeline.fit(X, y)
+    trials = read_trials(log_file=AUTOML_LOG_PATH)
+    selection = refit_best_feasible(pipeline=pipeline, X=X, y=y, trials=trials)
+    return {"trials": trials, **selection}
+
+
+def refit_best_feasible(*, pipeline: Pipeline, X, y, trials: List[Dict]) -> Dict:
+    """Reentrena el mejor trial factible si el modelo elegido por FLAML no lo es.
+
+    FLAML solo usa ``metric_constraints`` como penalización dentro de la búsqueda de
+    cada estimador y elige el modelo final por pérdida.
+    """
+    metric_constraints = build_metric_constraints()
+    selected_trial = select_best_feasible_trial(
+        trials=trials, metric_constraints=metric_constraints
+    )
+    if selected_trial is None:
+        raise RuntimeError(
+            f"No AutoML trial in {AUTOML_LOG_PATH} satisfied the inference "
+            f"constraints: {metric_constraints}"
+        )
+
+    automl = pipeline.named_steps["regressor"]
+    learner, config = selected_trial["learner"], selected_trial["config"]
+    retrained = bool(metric_constraints) and (
+        learner != automl.best_estimator or config != automl.best_config
+    )
+    if retrained:
+        logger.info(
+            "Best model violates the inference constraints. "
+            "Retraining best feasible candidate: %s %s",
+            learner,
+            config,
+        )
+        # Con max_iter=1 FLAML entrena la configuración inicial sin evaluarla,
+        # por lo que best_loss queda en inf: la pérdida válida es la del trial.
+        pipeline.fit(
+            X,
+            y,
+            regressor__estimator_list=[learner],
+            regressor__starting_points={learner: config},
+            regressor__max_iter=1,
+            regressor__log_file_name="",
+        )
+    return {"selected_trial": selected_trial, "retrained": retrained}
@@ -11,6 +11,8 @@ from sklearn.pipeline import Pipeline
 from src.config import (
     AUTOML_SUMMARY_REPORT_PATH,
     FEATURE_IMPORTANCE_PLOT_PATH,
+    INTERVAL_ALPHA,
+    INTERVAL_MAX_LATENCY_OVERHEAD,
     MAIN_LOG_PATH,
     RANDOM_STATE,
     REPORTS_DIR,
@@ -20,7 +22,21 @@ from src.config import (
     TRAIN_FILE,
 )
 from src.data_manager import load_dataset, save_metrics, save_pipeline
-from src.pipeline import create_pipeline
+from src.inference_cost import (
+    is_feasible,
+    measure_inference_cost,
+    summarize_candidate_costs,
+)
+from src.intervals import (
+    ConformalIntervalRegressor,
+    benchmark_interval_overhead,
+    conformal_quantile,
+)
+from src.pipeline import (
+    build_metric_constraints,
+    create_pipeline,
+    fit_within_constraints,
+)
 
 
 REPORTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -55,8 +71,11 @@ def run_training() -> None:
 
     pipeline = create_pipeline()
     logger.info("Training the pipeline with AutoML (logs will be shown)...")
-    pipeline.fit(X_train, y_train)
+    selection = fit_within_constraints(pipeline=pipeline, X=X_train, y=y_train)
+    selected_trial = selection["selected_trial"]
     logger.info("AutoML training complete.")
+    automl = pipeline.named_steps["regressor"]
+    preprocessor = Pipeline(pipeline.steps[:-1])
 
     logger.info("---Detailed Model Evaluation ---")
     y_pred_train = pipeline.predict(X_train)
@@ -75,19 +94,67 @@ def run_training() -> None:
             "rmse": np.sqrt(mean_squared_error(y_test, y_pred_test)),
             "mae": mean_absolute_error(y_test, y_pred_test),
         },
-        "best_model_name": pipeline.named_steps[
-            "regressor"
-        ].model.estimator.__class__.__name__,
+        "best_model_name": automl.model.estimator.__class__.__name__,
+        # Mismo objeto y datos que en la búsqueda: las restricciones se evalúan aquí
+        "estimator_inference_cost": measure_inference_cost(
+            model=automl.model, X=preprocessor.transform(X_test)
+        ),
+        # Costo de servir el pipeline completo (imputer + scaler + modelo)
+        "inference_cost": measure_inference_cost(model=pipeline, X=X_test),
+        "candidate_inference_cost": summarize_candidate_costs(
+            trials=selection["trials"]
+        ),
+        "model_selection": {
+            "learner": selected_trial["learner"],
+            "config": selected_trial["config"],
+            "cv_r2_score": 1 - selected_trial["val_loss"],
+            "retrained_for_constraints": selection["retrained"],
+        },
     }
 
     logger.info(f"  Best Model: {metrics['best_model_name']}")
     logger.info(f"  Train R^2 Score: {metrics['train']['r2_score']:.4f}")
     logger.info(f"  Test R^2 Score: {metrics['test']['r2_score']:.4f}")
+    inference_cost = metrics["inference_cost"]
+    logger.info(
+        f"  Predict latency p99: {inference_cost['predict_latency_p99_ms']:.3f} ms, "
+        f"Model size: {inference_cost['model_size_mb']:.3f} MB"
+    )
+    if not is_feasible(
+        trial=metrics["estimator_inference_cost"],
+        metric_constraints=build_metric_constraints(),
+    ):
+        logger.warning(
+            "Final model retrained on the full train split exceeds the inference constraints."
+        )
+
+    logger.info("Calibrating conformal prediction intervals on the test split...")
+    interval_model = ConformalIntervalRegressor(
+        pipeline=pipeline,
+        residual_quantile=conformal_quantile(
+            residuals=y_test - y_pred_test, alpha=INTERVAL_ALPHA
+        ),
+        alpha=INTERVAL_ALPHA,
+    )
+    _, lower_test, upper_test = interval_model.predict_interval(X_test)
+    metrics["prediction_interval"] = {
+        "alpha": INTERVAL_ALPHA,
+        "residual_quantile": interval_model.residual_quantile,
+        "calibration_coverage": float(np.mean((y_test >= lower_test) & (y_test <= upper_test))),
+        **benchmark_interval_overhead(model=interval_model, X=X_test),
+    }
+    interval_metrics = metrics["prediction_interval"]
+    logger.info(
+        f"  Interval half-width: {interval_metrics['residual_quantile']:.4f}, "
+        f"Latency overhead: {interval_metrics['latency_overhead']:.2%}"
+    )
+    if interval_metrics["latency_overhead"] > INTERVAL_MAX_LATENCY_OVERHEAD:
+        logger.warning(
+            f"Interval latency overhead exceeds the budget of {INTERVAL_MAX_LATENCY_OVERHEAD:.0%}."
+        )
     save_metrics(metrics=metrics)
 
     logger.info("Building and saving summary report...")
-    automl = pipeline.named_steps["regressor"]
-    preprocessor = Pipeline(pipeline.steps[:-1])
     X_train_processed = pd.DataFrame(
         preprocessor.transform(X_train), columns=X_train.columns
     )
@@ -98,9 +165,35 @@ def run_training() -> None:
         "      AutoML Final Summary Report",
         "=" * 50,
         f"\nBest Model Found: {final_model.__class__.__name__}",
-        f"Best R2 Score (during CV): {-automl.best_loss:.4f}",
+        f"Best R2 Score (during CV): {1 - selected_trial['val_loss']:.4f}",
+        f"Retrained to satisfy inference constraints: {selection['retrained']}",
         "\n--- Best Model Configuration ---",
         *[f"  - {key}: {value}" for key, value in automl.best_config.items()],
+        "\n--- Inference Constraints ---",
+        *(
+            [
+                f"  - {name} {op} {threshold}"
+                for name, op, threshold in build_metric_constraints()
+            ]
+            or ["  - none"]
+        ),
+        "\n--- Inference Cost (final model, test split) ---",
+        *[
+            f"  - {key}: {value:.4f}"
+            for key, value in metrics["estimator_inference_cost"].items()
+        ],
+        "\n--- Inference Cost (serving pipeline, test split) ---",
+        *[f"  - {key}: {value:.4f}" for key, value in inference_cost.items()],
+        "\n--- Inference Cost per Candidate (best trial during CV) ---",
+        *[
+            f"  - {learner}: R2={cost['r2_score']:.4f}, "
+            f"p99={cost['predict_latency_p99_ms']:.3f} ms, "
+            f"throughput={cost['batch_throughput_rows_per_sec']:.0f} rows/s, "
+            f"size={cost['model_size_mb']:.3f} MB"
+            for learner, cost in metrics["candidate_inference_cost"].items()
+        ],
+        "\n--- Prediction Interval (split conformal, test split) ---",
+        *[f"  - {key}: {value:.4f}" for key, value in interval_metrics.items()],
     ]
 
     importances = []
@@ -155,7 +248,7 @@ def run_training() -> None:
     plt.close()
     logger.info(f"SHAP plot saved to: {SHAP_SUMMARY_PATH}")
 
-    save_pipeline(pipeline_to_persist=pipeline)
+    save_pipeline(pipeline_to_persist=interval_model)
     logger.info("Training pipeline finished successfully!")
 
 
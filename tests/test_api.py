@@ -1,6 +1,7 @@
 # tests/test_api.py
 
 from fastapi.testclient import TestClient
+import app.main as main
 from app.main import app  # Importa tu app de FastAPI
 
 # Creamos un cliente de prueba
@@ -35,6 +36,8 @@ def test_prediction_success():
     data = response.json()
     assert "prediction" in data
     assert isinstance(data["prediction"], float)
+    if data["lower_bound"] is not None:
+        assert data["lower_bound"] <= data["prediction"] <= data["upper_bound"]
 
 
 def test_prediction_invalid_data():
@@ -54,3 +57,47 @@ def test_prediction_invalid_data():
     response = client.post("/predict", json=payload)
 
     assert response.status_code == 422  # Unprocessable Entity
+
+
+def test_batch_prediction_success():
+    """Prueba que el endpoint de lote devuelva predicción e intervalo por registro."""
+    payload = {
+        "CRIM": 0.02731,
+        "INDUS": 7.07,
+        "NOX": 0.469,
+        "RM": 6.421,
+        "AGE": 78.9,
+        "DIS": 4.9671,
+        "TAX": 242,
+        "PTRATIO": 17.8,
+        "B": 396.9,
+        "LSTAT": 9.14,
+    }
+    response = client.post("/predict/batch", json=[payload, payload])
+
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert len(predictions) == 2
+    for item in predictions:
+        if item["lower_bound"] is not None:
+            assert item["lower_bound"] <= item["prediction"] <= item["upper_bound"]
+
+
+def test_batch_prediction_too_large(monkeypatch):
+    """Prueba que la API rechace lotes por encima del tamaño máximo."""
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 1)
+    payload = {
+        "CRIM": 0.02731,
+        "INDUS": 7.07,
+        "NOX": 0.469,
+        "RM": 6.421,
+        "AGE": 78.9,
+        "DIS": 4.9671,
+        "TAX": 242,
+        "PTRATIO": 17.8,
+        "B": 396.9,
+        "LSTAT": 9.14,
+    }
+    response = client.post("/predict/batch", json=[payload, payload])
+
+    assert response.status_code == 413
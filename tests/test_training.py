@@ -1,8 +1,41 @@
 # tests/test_training.py
 
+import json
+
 import joblib
+import numpy as np
 import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import r2_score
+
+import src.pipeline as pipeline_module
 from src.config import MODEL_PATH
+from src.inference_cost import (
+    cost_aware_r2,
+    measure_inference_cost,
+    read_trials,
+    select_best_feasible_trial,
+    summarize_candidate_costs,
+)
+from src.intervals import ConformalIntervalRegressor, conformal_quantile
+
+# Dato de prueba (debe tener todas las columnas esperadas)
+SAMPLE_RECORD = {
+    "CRIM": 0.027,
+    "ZN": 0.0,
+    "INDUS": 7.07,
+    "CHAS": 0,
+    "NOX": 0.469,
+    "RM": 6.421,
+    "AGE": 78.9,
+    "DIS": 4.967,
+    "RAD": 2,
+    "TAX": 242,
+    "PTRATIO": 17.8,
+    "B": 396.9,
+    "LSTAT": 9.14,
+}
 
 
 def test_pipeline_generates_valid_model():
@@ -14,26 +47,176 @@ def test_pipeline_generates_valid_model():
     except Exception as e:
         assert False, f"El modelo no se pudo cargar: {e}"
 
-    # Crear un dato de prueba (debe tener todas las columnas esperadas)
-    sample_data = {
-        "CRIM": [0.027],
-        "ZN": [0.0],
-        "INDUS": [7.07],
-        "CHAS": [0],
-        "NOX": [0.469],
-        "RM": [6.421],
-        "AGE": [78.9],
-        "DIS": [4.967],
-        "RAD": [2],
-        "TAX": [242],
-        "PTRATIO": [17.8],
-        "B": [396.9],
-        "LSTAT": [9.14],
-    }
-    sample_df = pd.DataFrame(sample_data)
+    sample_df = pd.DataFrame([SAMPLE_RECORD])
 
     try:
         prediction = pipeline.predict(sample_df)
         assert isinstance(prediction[0], float)
     except Exception as e:
         assert False, f"La predicción falló con un dato de muestra: {e}"
+
+
+def test_inference_cost_is_measured():
+    """Verifica que se mide la latencia, el throughput y el tamaño del modelo."""
+    pipeline = joblib.load(MODEL_PATH)
+    sample_df = pd.DataFrame([SAMPLE_RECORD] * 5)
+
+    cost = measure_inference_cost(model=pipeline, X=sample_df)
+
+    assert cost["predict_latency_p99_ms"] >= cost["predict_latency_p50_ms"] > 0
+    assert cost["batch_throughput_rows_per_sec"] > 0
+    assert cost["model_size_mb"] > 0
+
+
+def test_predict_interval_uses_a_single_predict_call():
+    """Verifica que el intervalo se calcula en la misma llamada vectorizada que la predicción."""
+
+    class CountingPipeline:
+        calls = 0
+
+        def predict(self, X):
+            self.calls += 1
+            return np.arange(len(X), dtype=float)
+
+    stub = CountingPipeline()
+    model = ConformalIntervalRegressor(pipeline=stub, residual_quantile=1.5, alpha=0.1)
+    sample_df = pd.DataFrame([SAMPLE_RECORD] * 4)
+
+    prediction, lower, upper = model.predict_interval(sample_df)
+
+    assert stub.calls == 1
+    np.testing.assert_array_equal(lower, prediction - 1.5)
+    np.testing.assert_array_equal(upper, prediction + 1.5)
+
+
+def test_conformal_quantile():
+    """Verifica el cuantil conformal con la corrección de muestra finita."""
+    residuals = list(range(1, 10))
+    assert conformal_quantile(residuals=residuals, alpha=0.2) == 8.0
+    assert conformal_quantile(residuals=residuals, alpha=0.1) == 9.0
+    with pytest.raises(ValueError):
+        conformal_quantile(residuals=residuals, alpha=0.01)
+
+
+def test_build_metric_constraints(monkeypatch):
+    """Verifica que solo los límites configurados se traducen a restricciones de FLAML."""
+    monkeypatch.setattr(pipeline_module, "MAX_PREDICT_LATENCY_P99_MS", None)
+    monkeypatch.setattr(pipeline_module, "MAX_MODEL_SIZE_MB", None)
+    assert pipeline_module.build_metric_constraints() == []
+
+    monkeypatch.setattr(pipeline_module, "MAX_PREDICT_LATENCY_P99_MS", 5.0)
+    monkeypatch.setattr(pipeline_module, "MAX_MODEL_SIZE_MB", 20)
+    assert pipeline_module.build_metric_constraints() == [
+        ("predict_latency_p99_ms", "<=", 5.0),
+        ("model_size_mb", "<=", 20),
+    ]
+
+
+def test_cost_aware_r2_logs_constraint_metrics(monkeypatch):
+    """Verifica que la métrica devuelve (1 - R2, métricas) con las claves de las restricciones."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(40, 3))
+    y = X @ np.array([1.0, -2.0, 0.5]) + rng.normal(scale=0.1, size=40)
+    estimator = LinearRegression().fit(X, y)
+
+    val_loss, metrics_to_log = cost_aware_r2(X, y, estimator, None, X, y)
+
+    assert val_loss == pytest.approx(1 - r2_score(y, estimator.predict(X)))
+    monkeypatch.setattr(pipeline_module, "MAX_PREDICT_LATENCY_P99_MS", 5.0)
+    monkeypatch.setattr(pipeline_module, "MAX_MODEL_SIZE_MB", 20)
+    for metric_name, _, _ in pipeline_module.build_metric_constraints():
+        assert metric_name in metrics_to_log
+
+
+def test_feasible_trial_selection_from_flaml_log(tmp_path):
+    """Verifica la lectura del log de FLAML y la selección del mejor trial factible."""
+    records = [
+        ("extra_tree", {"n_estimators": 500}, 0.10, 12.0, 40.0),
+        ("extra_tree", {"n_estimators": 50}, 0.15, 2.0, 4.0),
+        ("lgbm", {"n_estimators": 20}, 0.12, 1.0, 0.5),
+    ]
+    log_file = tmp_path / "automl_flaml.log"
+    with open(log_file, "w") as f:
+        for record_id, (learner, config, val_loss, latency, size) in enumerate(records):
+            record = {
+                "record_id": record_id,
+                "iter_per_learner": 1,
+                "logged_metric": {
+                    "r2_score": 1 - val_loss,
+                    "predict_latency_p99_ms": latency,
+                    "model_size_mb": size,
+                },
+                "trial_time": 0.1,
+                "wall_clock_time": float(record_id),
+                "validation_loss": val_loss,
+                "config": {**config, "FLAML_sample_size": 300},
+                "learner": learner,
+                "sample_size": 300,
+            }
+            f.write(json.dumps(record) + "\n")
+        f.write(json.dumps({"curr_best_record_id": 0}) + "\n")
+
+    trials = read_trials(log_file=log_file)
+    assert [trial["learner"] for trial in trials] == ["extra_tree", "extra_tree", "lgbm"]
+    assert trials[0]["config"] == {"n_estimators": 500}
+
+    candidates = summarize_candidate_costs(trials=trials)
+    assert candidates["extra_tree"]["val_loss"] == 0.10
+    assert candidates["lgbm"]["model_size_mb"] == 0.5
+
+    assert select_best_feasible_trial(trials=trials, metric_constraints=[])["val_loss"] == 0.10
+    best = select_best_feasible_trial(
+        trials=trials, metric_constraints=[("predict_latency_p99_ms", "<=", 5.0)]
+    )
+    assert (best["learner"], best["config"]) == ("lgbm", {"n_estimators": 20})
+    assert (
+        select_best_feasible_trial(
+            trials=trials, metric_constraints=[("model_size_mb", "<=", 0.1)]
+        )
+        is None
+    )
+
+
+def test_constrained_selection_on_real_flaml_log(tmp_path, monkeypatch):
+    """Entrena una búsqueda corta de FLAML y verifica que el log registra todos los trials
+    y que se reentrena el mejor trial factible."""
+    max_iter = 6
+    monkeypatch.setattr(pipeline_module, "AUTOML_LOG_PATH", tmp_path / "automl_flaml.log")
+    monkeypatch.setattr(pipeline_module, "MAX_PREDICT_LATENCY_P99_MS", None)
+    monkeypatch.setattr(pipeline_module, "MAX_MODEL_SIZE_MB", None)
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(120, 3)), columns=["RM", "LSTAT", "DIS"])
+    y = X @ np.array([3.0, -2.0, 0.5]) + rng.normal(scale=0.5, size=120)
+
+    pipeline = pipeline_module.create_pipeline(
+        time_budget=-1,
+        max_iter=max_iter,
+        estimator_list=["rf", "extra_tree"],
+        n_splits=3,
+    )
+    selection = pipeline_module.fit_within_constraints(pipeline=pipeline, X=X, y=y)
+    trials = selection["trials"]
+
+    # Con log_type="all" también se registran los trials que no mejoran la mejor pérdida
+    assert len(trials) == max_iter
+    assert not selection["retrained"]
+    assert selection["selected_trial"]["val_loss"] == min(t["val_loss"] for t in trials)
+
+    # Límite de tamaño que solo cumple el trial más pequeño
+    smallest = min(trials, key=lambda trial: trial["model_size_mb"])
+    monkeypatch.setattr(pipeline_module, "MAX_MODEL_SIZE_MB", smallest["model_size_mb"])
+    feasible = [t for t in trials if t["model_size_mb"] <= smallest["model_size_mb"]]
+    expected = min(feasible, key=lambda trial: trial["val_loss"])
+
+    selection = pipeline_module.refit_best_feasible(
+        pipeline=pipeline, X=X, y=y, trials=trials
+    )
+
+    automl = pipeline.named_steps["regressor"]
+    assert selection["selected_trial"] == expected
+    assert (automl.best_estimator, automl.best_config) == (
+        expected["learner"],
+        expected["config"],
+    )
+    assert pipeline.predict(X).shape == (120,)